@@ -14,10 +14,12 @@ model = mteb.get_model(model_name)  # uses the correct wrapper internally
 benchmarks = mteb.get_benchmarks(names=["ViDoRe(v1)", "ViDoRe(v2)"])
 evaluator = mteb.MTEB(tasks=benchmarks)
 
-# --- run with small batches to stay under ~32 GB VRAM ---
+# --- run with small batches to stay under ~32 GB VRAM; override with BATCH_SIZE ---
+# Lower value for less VRAM usage. 4 is the max I've managed to get to work with an RTX 5090.
+batch_size = int(os.environ.get("BATCH_SIZE", "4"))
 results = evaluator.run(
     model,
-    encode_kwargs={"batch_size": 4},     # Lower value for less VRAM usage. 4 is the max I've managed to get to work with an RTX 5090.
+    encode_kwargs={"batch_size": batch_size},
     verbosity=2,
 )
 print(results)
\ No newline at end of file
@@ -13,7 +13,9 @@ warnings.filterwarnings("ignore", category=UserWarning, module="transformers")
 from config import (
     MODEL_PATH,
     ENABLE_COMPILE,
+    ENABLE_CUDA_GRAPHS,
     ENABLE_WARMUP,
+    QUANTIZATION,
     ATTENTION_BACKEND,
     RESOLUTION_SET,
 )
@@ -34,13 +36,17 @@ def main():
     print(f"  Model Path: {MODEL_PATH}")
     print(f"  Attention Backend: {ATTENTION_BACKEND}")
     print(f"  Compile Enabled: {ENABLE_COMPILE}")
+    print(f"  CUDA Graphs Enabled: {ENABLE_CUDA_GRAPHS}")
     print(f"  Warmup Enabled: {ENABLE_WARMUP}")
+    print(f"  Quantization: {QUANTIZATION}")
     print()
 
     pipe = load_models(
         model_path=MODEL_PATH,
         enable_compile=ENABLE_COMPILE,
         attention_backend=ATTENTION_BACKEND,
+        quantization=QUANTIZATION,
+        enable_cuda_graphs=ENABLE_CUDA_GRAPHS,
     )
 
     # Warm up the model if enabled
@@ -1,10 +1,44 @@
 """Image generation logic for Z-Image-Turbo application."""
 
-import torch
-import gradio as gr
-from diffusers import FlowMatchEulerDiscreteScheduler
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import ENABLE_COMPILE, ENABLE_CUDA_GRAPHS
 from utils import get_resolution
 
+# One CUDA generator per thread, reseeded for every image
+_thread_state = threading.local()
+
+# Inductor keeps CUDA graph trees per thread, so graphs recorded during warmup
+# are only replayed on the thread that recorded them. With CUDA Graphs on, all
+# pipeline calls run on this one thread instead of on whichever Gradio worker
+# took the request, which would record (and hold VRAM for) its own copies.
+_inference_thread = (
+    ThreadPoolExecutor(max_workers=1, thread_name_prefix="z-image-inference")
+    if ENABLE_COMPILE and ENABLE_CUDA_GRAPHS
+    else None
+)
+
+
+@functools.lru_cache(maxsize=16)
+def _scheduler_for(shift):
+    """Build (once per shift value) the flow matching scheduler."""
+    from diffusers import FlowMatchEulerDiscreteScheduler
+
+    return FlowMatchEulerDiscreteScheduler(num_train_timesteps=1000, shift=shift)
+
+
+def _seeded_generator(seed):
+    """Return the calling thread's CUDA generator, reseeded with seed."""
+    generator = getattr(_thread_state, "generator", None)
+    if generator is None:
+        import torch
+
+        generator = _thread_state.generator = torch.Generator("cuda")
+    return generator.manual_seed(seed)
+
 
 def generate_image(
     pipe,
@@ -15,7 +49,7 @@ def generate_image(
     num_inference_steps=50,
     shift=3.0,
     max_sequence_length=1024,
-    progress=gr.Progress(track_tqdm=True),
+    progress=None,
 ):
     """
     Generate an image using the Z-Image pipeline.
@@ -25,39 +59,47 @@ def generate_image(
         prompt (str): Text prompt describing the desired image
         resolution (str): Resolution in format "WIDTHxHEIGHT"
         seed (int): Random seed for reproducibility
-        guidance_scale (float): Classifier-free guidance scale
+        guidance_scale (float): Classifier-free guidance scale; 0.0 disables
+            CFG and runs one transformer pass per step
         num_inference_steps (int): Number of denoising steps
         shift (float): Time shift parameter for the flow matching scheduler
         max_sequence_length (int): Maximum sequence length for text encoding
-        progress: Gradio progress tracker
+        progress: Unused; progress is tracked by the Gradio event handler
 
     Returns:
         PIL.Image: Generated image
     """
     width, height = get_resolution(resolution)
 
-    generator = torch.Generator("cuda").manual_seed(seed)
+    def run():
+        # Rounded so slider float noise does not fill the cache
+        pipe.scheduler = _scheduler_for(round(shift, 4))
 
-    scheduler = FlowMatchEulerDiscreteScheduler(num_train_timesteps=1000, shift=shift)
-    pipe.scheduler = scheduler
+        return pipe(
+            prompt=prompt,
+            height=height,
+            width=width,
+            guidance_scale=guidance_scale,
+            num_inference_steps=num_inference_steps,
+            generator=_seeded_generator(seed),
+            max_sequence_length=max_sequence_length,
+        ).images[0]
 
-    image = pipe(
-        prompt=prompt,
-        height=height,
-        width=width,
-        guidance_scale=guidance_scale,
-        num_inference_steps=num_inference_steps,
-        generator=generator,
-        max_sequence_length=max_sequence_length,
-    ).images[0]
+    if _inference_thread is None:
+        return run()
 
-    return image
+    # Carry the caller's context over so Gradio's tqdm progress tracking works
+    return _inference_thread.submit(contextvars.copy_context().run, run).result()
 
 
 def warmup_model(pipe, resolutions):
     """
     Warm up the model by generating dummy images at various resolutions.
 
+    Each distinct (width, height) is compiled once; duplicate shapes are
+    skipped and square shapes are warmed first so related kernels share
+    the autotune cache.
+
     Args:
         pipe: ZImagePipeline instance
         resolutions (list): List of resolution strings to warm up
@@ -66,18 +108,24 @@ def warmup_model(pipe, resolutions):
 
     dummy_prompt = "warmup"
 
-    for res_str in resolutions:
+    shapes = sorted(
+        {get_resolution(res_str) for res_str in resolutions},
+        key=lambda wh: (wh[0] != wh[1], wh[0] * wh[1], wh),
+    )
+
+    for width, height in shapes:
+        res_str = f"{width}x{height}"
         print(f"Warming up for resolution: {res_str}")
         try:
-            for i in range(3):
-                generate_image(
-                    pipe,
-                    prompt=dummy_prompt,
-                    resolution=res_str,
-                    num_inference_steps=9,
-                    guidance_scale=0.0,
-                    seed=42 + i,
-                )
+            # The first call compiles the shape; extra steps add nothing
+            generate_image(
+                pipe,
+                prompt=dummy_prompt,
+                resolution=res_str,
+                num_inference_steps=3,
+                guidance_scale=0.0,
+                seed=42,
+            )
         except Exception as e:
             print(f"Warmup failed for {res_str}: {e}")
 
@@ -1,14 +1,94 @@
 """Model loading and management for Z-Image-Turbo application."""
 
 import os
+
 import torch
 from diffusers import AutoencoderKL
+from huggingface_hub import snapshot_download
 from transformers import AutoModel, AutoTokenizer
 from diffusers import ZImagePipeline
 from diffusers.models.transformers.transformer_z_image import ZImageTransformer2DModel
+from config import QUANTIZATION_MODES, RESOLUTION_SET
+
+# Persist compiled graphs and autotune results on disk so later processes
+# reuse them. Compiled kernels are keyed on shape, so the fixed RES_CHOICES
+# resolutions hit the cache on every start after the first warmup.
+os.environ.setdefault(
+    "TORCHINDUCTOR_CACHE_DIR", os.path.expanduser("~/.cache/z-image-turbo/inductor")
+)
 
 
-def load_models(model_path, enable_compile=False, attention_backend="native"):
+def quantize_transformer(transformer, quantization):
+    """
+    Quantize transformer weights and activations with torchao.
+
+    Args:
+        transformer: ZImageTransformer2DModel on the GPU
+        quantization (str): "fp8", "int8", "auto" (fp8 on SM89+, int8 on
+            SM80+), or "none"
+
+    Returns:
+        ZImageTransformer2DModel: The (possibly) quantized transformer
+    """
+    # Reject typos before anything else, so they are not hidden behind the
+    # torchao or GPU checks below
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(
+            f"Unsupported quantization: {quantization!r} "
+            f"(expected one of {', '.join(QUANTIZATION_MODES)})"
+        )
+
+    if quantization == "none":
+        return transformer
+
+    capability = torch.cuda.get_device_capability()
+
+    if quantization == "auto":
+        if capability >= (8, 9):
+            quantization = "fp8"
+        elif capability >= (8, 0):
+            quantization = "int8"
+        else:
+            quantization = "none"
+
+    if quantization == "none":
+        return transformer
+
+    if quantization == "fp8" and capability < (8, 9):
+        print("FP8 quantization requires an SM89+ GPU, skipping quantization")
+        return transformer
+
+    if quantization == "int8" and capability < (8, 0):
+        print("INT8 quantization requires an SM80+ GPU, skipping quantization")
+        return transformer
+
+    try:
+        from torchao.quantization import (
+            float8_dynamic_activation_float8_weight,
+            int8_dynamic_activation_int8_weight,
+            quantize_,
+        )
+    except ImportError:
+        print("torchao not installed, skipping quantization")
+        return transformer
+
+    if quantization == "fp8":
+        config = float8_dynamic_activation_float8_weight()
+    else:
+        config = int8_dynamic_activation_int8_weight()
+
+    print(f"Quantizing transformer to {quantization}...")
+    quantize_(transformer, config)
+    return transformer
+
+
+def load_models(
+    model_path,
+    enable_compile=False,
+    attention_backend="native",
+    quantization="none",
+    enable_cuda_graphs=False,
+):
     """
     Load and initialize all required models for Z-Image generation.
 
@@ -16,47 +96,49 @@ def load_models(model_path, enable_compile=False, attention_backend="native"):
         model_path (str): Path to the model directory or HuggingFace model ID
         enable_compile (bool): Whether to enable torch.compile optimizations
         attention_backend (str): Attention backend to use ("flash", "_flash_3", or "native")
+        quantization (str): Transformer quantization ("none", "auto", "fp8", or "int8")
+        enable_cuda_graphs (bool): Whether to capture the compiled transformer in
+            CUDA Graphs (only applies when enable_compile is set)
 
     Returns:
         ZImagePipeline: Initialized pipeline ready for image generation
     """
     print(f"Loading models from {model_path}...")
 
-    if not os.path.exists(model_path):
-        vae = AutoencoderKL.from_pretrained(
-            f"{model_path}",
-            subfolder="vae",
-            torch_dtype=torch.bfloat16,
-            device_map="cuda",
+    # Let the remaining fp32 matmuls and convolutions use TF32 tensor cores
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+
+    model_dir = model_path
+    if not os.path.exists(model_dir):
+        # Fetch every component's files in one call, which downloads them in
+        # parallel. Models are still built one at a time below: from_pretrained
+        # patches process-wide torch init hooks and is not thread-safe.
+        model_dir = snapshot_download(
+            model_path,
+            allow_patterns=[
+                f"{subfolder}/*"
+                for subfolder in ("vae", "text_encoder", "tokenizer", "transformer")
+            ],
         )
 
-        text_encoder = AutoModel.from_pretrained(
-            f"{model_path}",
-            subfolder="text_encoder",
-            torch_dtype=torch.bfloat16,
-            device_map="cuda",
-        ).eval()
-
-        tokenizer = AutoTokenizer.from_pretrained(
-            f"{model_path}", subfolder="tokenizer"
-        )
-    else:
-        vae = AutoencoderKL.from_pretrained(
-            os.path.join(model_path, "vae"),
-            torch_dtype=torch.bfloat16,
-            device_map="cuda",
-        )
+    def load(model_cls, subfolder, **kwargs):
+        """Load one pipeline component from the local model directory."""
+        return model_cls.from_pretrained(os.path.join(model_dir, subfolder), **kwargs)
 
-        text_encoder = AutoModel.from_pretrained(
-            os.path.join(model_path, "text_encoder"),
-            torch_dtype=torch.bfloat16,
-            device_map="cuda",
-        ).eval()
+    vae = load(AutoencoderKL, "vae", torch_dtype=torch.bfloat16, device_map="cuda")
 
-        tokenizer = AutoTokenizer.from_pretrained(os.path.join(model_path, "tokenizer"))
+    text_encoder = load(
+        AutoModel, "text_encoder", torch_dtype=torch.bfloat16, device_map="cuda"
+    ).eval()
 
+    tokenizer = load(AutoTokenizer, "tokenizer")
     tokenizer.padding_side = "left"
 
+    transformer = load(ZImageTransformer2DModel, "transformer").to(
+        "cuda", torch.bfloat16
+    )
+
     if enable_compile:
         print("Enabling torch.compile optimizations...")
         torch._inductor.config.conv_1x1_as_mm = True
@@ -65,7 +147,15 @@ def load_models(model_path, enable_compile=False, attention_backend="native"):
         torch._inductor.config.coordinate_descent_check_all_directions = True
         torch._inductor.config.max_autotune_gemm = True
         torch._inductor.config.max_autotune_gemm_backends = "TRITON,ATEN"
+        # Off globally; mode="max-autotune" enables CUDA Graphs for the
+        # transformer compile alone, so the VAE decode never records graphs
         torch._inductor.config.triton.cudagraphs = False
+        torch._inductor.config.fx_graph_cache = True
+        torch._inductor.config.fx_graph_remote_cache = False
+        # Keep a compiled graph for every supported resolution in-process
+        torch._dynamo.config.cache_size_limit = max(
+            torch._dynamo.config.cache_size_limit, len(RESOLUTION_SET) * 2
+        )
 
     pipe = ZImagePipeline(
         scheduler=None,
@@ -78,24 +168,31 @@ def load_models(model_path, enable_compile=False, attention_backend="native"):
     if enable_compile:
         pipe.vae.disable_tiling()
 
-    if not os.path.exists(model_path):
-        transformer = ZImageTransformer2DModel.from_pretrained(
-            f"{model_path}", subfolder="transformer"
-        ).to("cuda", torch.bfloat16)
-    else:
-        transformer = ZImageTransformer2DModel.from_pretrained(
-            os.path.join(model_path, "transformer")
-        ).to("cuda", torch.bfloat16)
-
-    pipe.transformer = transformer
+    # Quantize before compiling so Inductor can fuse dequantization into the matmuls
+    pipe.transformer = quantize_transformer(transformer, quantization)
     pipe.transformer.set_attention_backend(attention_backend)
 
+    if attention_backend == "native" and torch.cuda.get_device_capability() >= (8, 0):
+        # Native attention goes through SDPA; restrict it to the fused
+        # Flash / memory-efficient kernels instead of the math fallback
+        print("Restricting native attention to fused SDPA kernels...")
+        torch.backends.cuda.enable_flash_sdp(True)
+        torch.backends.cuda.enable_mem_efficient_sdp(True)
+        torch.backends.cuda.enable_math_sdp(False)
+
     if enable_compile:
+        # CUDA Graphs replay each denoising step without per-kernel launch
+        # overhead; one graph is recorded per resolution
         print("Compiling transformer...")
         pipe.transformer = torch.compile(
-            pipe.transformer, mode="max-autotune-no-cudagraphs", fullgraph=False
+            pipe.transformer,
+            mode="max-autotune" if enable_cuda_graphs else "max-autotune-no-cudagraphs",
+            fullgraph=False,
         )
 
-    pipe.to("cuda", torch.bfloat16)
+        print("Compiling VAE decoder...")
+        pipe.vae.decode = torch.compile(
+            pipe.vae.decode, mode="max-autotune-no-cudagraphs", fullgraph=False
+        )
 
     return pipe
@@ -1,15 +1,62 @@
 """Prompt expansion and enhancement for Z-Image-Turbo application."""
 
+import asyncio
 import os
-import json
-import re
 from dataclasses import dataclass
 from typing import Optional
 
-from openai import OpenAI
+import orjson
+from openai import AsyncOpenAI, OpenAI
 
 from pe import SYSTEM_PROMPT_TEMPLATE
 
+# The template is constant, so check once whether it takes the user prompt
+_HAS_PROMPT_SLOT = "{prompt}" in SYSTEM_PROMPT_TEMPLATE
+
+
+def _first_json_object(text: str, start: int = 0):
+    """
+    Parse the first balanced {...} object in text at or after start.
+
+    A single scan tracks brace depth, ignoring braces inside JSON strings,
+    which covers both fenced ```json blocks and bare JSON responses.
+
+    Args:
+        text (str): Text that may contain a JSON object
+        start (int): Index to start searching for the opening brace
+
+    Returns:
+        The parsed value, or None if no balanced object is found
+
+    Raises:
+        orjson.JSONDecodeError: If the balanced span is not valid JSON
+    """
+    start = text.find("{", start)
+    if start < 0:
+        return None
+
+    depth = 0
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return orjson.loads(text[start : i + 1])
+
+    return None
+
 
 @dataclass
 class PromptOutput:
@@ -44,7 +91,7 @@ class PromptExpander:
         Returns:
             str: System prompt for the API
         """
-        if "{prompt}" in SYSTEM_PROMPT_TEMPLATE:
+        if _HAS_PROMPT_SLOT:
             return SYSTEM_PROMPT_TEMPLATE.format(prompt=original_prompt)
         return SYSTEM_PROMPT_TEMPLATE
 
@@ -104,35 +151,51 @@ class APIPromptExpander(PromptExpander):
             PromptOutput: Enhanced prompt result
         """
         if not self.client:
-            return PromptOutput(
-                status="error",
-                prompt=prompt,
-                messages=["API client not initialized. Check API key."],
-            )
+            return self._client_error(prompt)
 
         system_prompt = self.get_system_prompt(prompt)
 
         try:
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-                top_p=0.9,
+                **self._completion_kwargs(prompt, system_prompt)
             )
+            return self._build_output(response, prompt, system_prompt)
 
-            content = response.choices[0].message.content
+        except Exception as e:
+            return PromptOutput(
+                status="error",
+                prompt=prompt,
+                messages=[f"API error: {str(e)}"],
+            )
 
-            # Try to extract JSON from the response
-            enhanced_prompt = self._extract_prompt(content, prompt)
+    async def extend_async(
+        self, prompt: str, client: Optional[AsyncOpenAI] = None
+    ) -> PromptOutput:
+        """
+        Extend/enhance a prompt using the async API client.
 
-            return PromptOutput(
-                status="success",
-                prompt=enhanced_prompt,
-                system_prompt=system_prompt,
+        Args:
+            prompt (str): Original prompt to enhance
+            client (AsyncOpenAI, optional): Shared client; a temporary one is
+                opened when omitted
+
+        Returns:
+            PromptOutput: Enhanced prompt result
+        """
+        if not self.client:
+            return self._client_error(prompt)
+
+        if client is None:
+            async with self._async_client() as client:
+                return await self.extend_async(prompt, client)
+
+        system_prompt = self.get_system_prompt(prompt)
+
+        try:
+            response = await client.chat.completions.create(
+                **self._completion_kwargs(prompt, system_prompt)
             )
+            return self._build_output(response, prompt, system_prompt)
 
         except Exception as e:
             return PromptOutput(
@@ -141,6 +204,69 @@ class APIPromptExpander(PromptExpander):
                 messages=[f"API error: {str(e)}"],
             )
 
+    async def extend_batch(self, prompts: list[str]) -> list[PromptOutput]:
+        """
+        Extend/enhance several prompts concurrently.
+
+        All requests share one pooled client, so the batch costs roughly one
+        round trip instead of one per prompt.
+
+        Args:
+            prompts (list[str]): Original prompts to enhance
+
+        Returns:
+            list[PromptOutput]: Enhanced prompt results, in input order
+        """
+        if not self.client:
+            return [self._client_error(prompt) for prompt in prompts]
+
+        # Async connection pools are bound to the running event loop, so the
+        # client lives for the duration of the batch rather than the instance
+        async with self._async_client() as client:
+            return list(
+                await asyncio.gather(
+                    *(self.extend_async(prompt, client) for prompt in prompts)
+                )
+            )
+
+    def _async_client(self) -> AsyncOpenAI:
+        """Create an async client for the configured endpoint."""
+        return AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+
+    def _completion_kwargs(self, prompt: str, system_prompt: str) -> dict:
+        """Build the chat completion request for a prompt."""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": 0.7,
+            "top_p": 0.9,
+        }
+
+    def _build_output(self, response, prompt: str, system_prompt: str) -> PromptOutput:
+        """Turn a chat completion response into a PromptOutput."""
+        content = response.choices[0].message.content
+
+        # Try to extract JSON from the response
+        enhanced_prompt = self._extract_prompt(content, prompt)
+
+        return PromptOutput(
+            status="success",
+            prompt=enhanced_prompt,
+            system_prompt=system_prompt,
+        )
+
+    @staticmethod
+    def _client_error(prompt: str) -> PromptOutput:
+        """Result returned when no API key was configured."""
+        return PromptOutput(
+            status="error",
+            prompt=prompt,
+            messages=["API client not initialized. Check API key."],
+        )
+
     def _extract_prompt(self, content: str, fallback: str) -> str:
         """
         Extract enhanced prompt from API response.
@@ -152,22 +278,17 @@ class APIPromptExpander(PromptExpander):
         Returns:
             str: Extracted or fallback prompt
         """
-        # Try to extract JSON
-        try:
-            # Look for JSON in markdown code blocks
-            json_match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", content, re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group(1))
-                if "prompt" in data:
+        # Plain-text responses cannot contain JSON, skip parsing entirely
+        if content and ("```" in content or content.lstrip().startswith("{")):
+            try:
+                # Fenced or bare, the first JSON object holds the prompt. Start
+                # after an opening fence, so braces in prose before it are skipped
+                data = _first_json_object(content, max(content.find("```"), 0))
+                if isinstance(data, dict) and "prompt" in data:
                     return data["prompt"]
 
-            # Try direct JSON parsing
-            data = json.loads(content)
-            if "prompt" in data:
-                return data["prompt"]
-
-        except (json.JSONDecodeError, AttributeError):
-            pass
+            except orjson.JSONDecodeError:
+                pass
 
         # Return content directly if it looks like a prompt
         if content and len(content) > 10:
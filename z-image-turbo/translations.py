@@ -1,12 +1,22 @@
 """Multi-language translations for Z-Image-Turbo UI."""
 
+import functools
+import json
+import os
+import sys
+import threading
+
 # Supported languages with their display names
 LANGUAGES = {
     "en": "English",
     "zh": "中文",
 }
 
-# Translation dictionary
+# Directory holding the <code>.json table for each non-English language
+LOCALES_DIR = os.path.join(os.path.dirname(__file__), "locales")
+
+# English source table. English is the fallback for every language; the
+# others are read from LOCALES_DIR on first use.
 TRANSLATIONS = {
     "en": {
         "title": "Z-Image Turbo",
@@ -26,27 +36,78 @@ TRANSLATIONS = {
         "language_label": "Language",
         "model_not_loaded": "Model not loaded.",
     },
-    "zh": {
-        "title": "Z-Image Turbo",
-        "subtitle": "快速 AI 图像生成",
-        "prompt_label": "提示词",
-        "prompt_placeholder": "在此输入您的提示词...",
-        "resolution_category": "分辨率类别",
-        "resolution_label": "宽 x 高 (比例)",
-        "seed_label": "随机种子",
-        "random_seed": "随机种子",
-        "steps_label": "步数",
-        "time_shift_label": "时间偏移",
-        "generate_btn": "生成",
-        "example_prompts": "示例提示词",
-        "generated_images": "生成的图像",
-        "seed_used": "使用的种子",
-        "language_label": "语言",
-        "model_not_loaded": "模型未加载。",
-    },
 }
 
+# Languages offered in the UI; English is the fallback and is always enabled
+ENABLED_LANGS = {
+    code.strip() for code in os.environ.get("Z_IMAGE_LANGS", "en,zh").split(",")
+} | {"en"}
+
+# Intern language codes so lookups compare by identity
+LANGUAGES = {
+    sys.intern(code): name for code, name in LANGUAGES.items() if code in ENABLED_LANGS
+}
+
+# Dropdown choices never change after import
+_LANGUAGE_CHOICES = tuple(LANGUAGES.items())
+
+# Translation keys, in the order of the English table
+_KEYS = tuple(sys.intern(key) for key in TRANSLATIONS["en"])
+
+# The only store for loaded languages: one flat (lang, key) -> text dict with
+# the English fallback merged in, instead of a nested table per language
+_FLAT = {}
+_loaded = set()
+_load_lock = threading.Lock()
+
+
+def _register(lang: str, table: dict) -> None:
+    """Index a language table in _FLAT, merging in the English fallback."""
+    english = TRANSLATIONS["en"]
+    merged = dict(english)
+    for key, text in table.items():
+        # Share the English string object when a locale leaves text untranslated
+        merged[key] = english[key] if text == english.get(key) else text
+    _FLAT.update(((lang, sys.intern(key)), text) for key, text in merged.items())
+    # Mark as loaded only after indexing, so readers that skip the lock never
+    # see a language whose flat entries are missing
+    _loaded.add(lang)
+
+
+_register("en", TRANSLATIONS["en"])
 
+
+def _ensure_loaded(lang: str) -> str:
+    """Return the language code to use for lang, loading its table on first use."""
+    if lang not in LANGUAGES:
+        return "en"
+
+    if lang not in _loaded:
+        # Gradio serves sessions concurrently; load each language only once
+        with _load_lock:
+            if lang not in _loaded:
+                path = os.path.join(LOCALES_DIR, f"{lang}.json")
+                with open(path, encoding="utf-8") as f:
+                    _register(sys.intern(lang), json.load(f))
+    return lang
+
+
+def get_translations(lang: str) -> dict:
+    """
+    Get the full translation table for a language, loading it on first use.
+
+    Args:
+        lang (str): Language code (e.g., 'en', 'zh')
+
+    Returns:
+        dict: Key to text mapping with English fallbacks merged in; the
+            English table for unsupported languages
+    """
+    lang = _ensure_loaded(lang)
+    return {key: _FLAT[(lang, key)] for key in _KEYS}
+
+
+@functools.lru_cache(maxsize=256)
 def get_text(lang: str, key: str) -> str:
     """
     Get translated text for a given language and key.
@@ -57,10 +118,18 @@ def get_text(lang: str, key: str) -> str:
 
     Returns:
         str: Translated text, falls back to English if not found
+
+    Results are memoized; the (lang, key) space is small and fixed.
     """
-    if lang not in TRANSLATIONS:
-        lang = "en"
-    return TRANSLATIONS[lang].get(key, TRANSLATIONS["en"].get(key, key))
+    # Values from Gradio events are fresh strings; intern them to match the table
+    lang = sys.intern(lang)
+    key = sys.intern(key)
+    lang = _ensure_loaded(lang)
+    try:
+        return _FLAT[(lang, key)]
+    except KeyError:
+        # English is merged into every language, so the key is unknown
+        return key
 
 
 def get_language_choices() -> list:
@@ -70,4 +139,4 @@ def get_language_choices() -> list:
     Returns:
         list: List of (code, display_name) tuples
     """
-    return [(code, name) for code, name in LANGUAGES.items()]
+    return list(_LANGUAGE_CHOICES)
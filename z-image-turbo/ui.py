@@ -1,11 +1,46 @@
 """Gradio UI for Z-Image-Turbo application."""
 
+import functools
 import random
 import gradio as gr
 from generator import generate_image
 from prompt_expander import prompt_enhance
 from config import RES_CHOICES, RESOLUTION_SET, EXAMPLE_PROMPTS
-from translations import TRANSLATIONS, LANGUAGES, get_text
+from translations import LANGUAGES, get_text, get_translations
+
+# Resolution categories as the integers the category dropdown uses
+_RES_CAT_INT_CHOICES = tuple(int(k) for k in RES_CHOICES)
+_RES_BY_INT = {int(k): v for k, v in RES_CHOICES.items()}
+
+# Example prompts per UI language, with the English fallback resolved up front
+_EXAMPLES_BY_LANG = {
+    lang: EXAMPLE_PROMPTS.get(lang, EXAMPLE_PROMPTS["en"]) for lang in LANGUAGES
+}
+
+# Page header; filled in per language by _header_markdown
+_HEADER_TEMPLATE = """<div align="center">
+
+# {title}
+
+[![GitHub](https://img.shields.io/badge/GitHub-little--scripts-181717?logo=github&logoColor=white)](https://github.com/athrael-soju/little-scripts)
+
+*{subtitle}*
+
+</div>"""
+
+
+@functools.lru_cache(maxsize=16)
+def _header_markdown(lang):
+    """Render the header markdown for a language, once per language."""
+    return _HEADER_TEMPLATE.format(
+        title=get_text(lang, "title"), subtitle=get_text(lang, "subtitle")
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_resolution(resolution):
+    """Strip the aspect ratio from a resolution label, e.g. "1024x1024 ( 1:1 )"."""
+    return resolution.partition(" ")[0]
 
 
 def create_generate_handler(pipe, prompt_expander_instance):
@@ -19,6 +54,8 @@ def create_generate_handler(pipe, prompt_expander_instance):
     Returns:
         function: Generate handler function for Gradio
     """
+    # Dedicated generator for random seeds, separate from the global one
+    _rng = random.Random()
 
     def generate(
         prompt,
@@ -60,14 +97,11 @@ def create_generate_handler(pipe, prompt_expander_instance):
             print(f"Enhanced prompt: {final_prompt}")
 
         if random_seed:
-            new_seed = random.randint(1, 1000000)
+            new_seed = _rng.randrange(1, 1000001)
         else:
-            new_seed = seed if seed != -1 else random.randint(1, 1000000)
+            new_seed = seed if seed != -1 else _rng.randrange(1, 1000001)
 
-        try:
-            resolution_str = resolution.split(" ")[0]
-        except Exception:
-            resolution_str = "1024x1024"
+        resolution_str = _parse_resolution(resolution) if resolution else "1024x1024"
 
         image = generate_image(
             pipe=pipe,
@@ -98,40 +132,19 @@ def update_res_choices(_res_cat):
     Returns:
         gr.update: Gradio update object with new choices
     """
-    if str(_res_cat) in RES_CHOICES:
-        res_choices = RES_CHOICES[str(_res_cat)]
-    else:
-        res_choices = RES_CHOICES["1024"]
+    res_choices = _RES_BY_INT.get(_res_cat, _RES_BY_INT[1024])
     return gr.update(value=res_choices[0], choices=res_choices)
 
 
-def update_ui_language(lang):
-    """
-    Update all UI components with the selected language.
-
-    Args:
-        lang (str): Language code
-
-    Returns:
-        tuple: Updated component properties
-    """
-    t = TRANSLATIONS.get(lang, TRANSLATIONS["en"])
-
-    # Get language-specific example prompts, fallback to English
-    examples = EXAMPLE_PROMPTS.get(lang, EXAMPLE_PROMPTS["en"])
+@functools.lru_cache(maxsize=16)
+def _language_updates(lang):
+    """Build the component updates for one language, once per language."""
+    t = get_translations(lang)
 
     # Return updates for all translatable components
     return (
         # Header markdown
-        f"""<div align="center">
-
-# {t['title']}
-
-[![GitHub](https://img.shields.io/badge/GitHub-little--scripts-181717?logo=github&logoColor=white)](https://github.com/athrael-soju/little-scripts)
-
-*{t['subtitle']}*
-
-</div>""",
+        _header_markdown(lang),
         # Prompt input
         gr.update(label=t["prompt_label"], placeholder=t["prompt_placeholder"]),
         # Resolution category
@@ -151,7 +164,7 @@ def update_ui_language(lang):
         # Example prompts header
         f"### {t['example_prompts']}",
         # Example dataset with language-specific prompts
-        gr.update(samples=examples),
+        gr.update(samples=_EXAMPLES_BY_LANG.get(lang, EXAMPLE_PROMPTS["en"])),
         # Output gallery
         gr.update(label=t["generated_images"]),
         # Seed used textbox
@@ -159,6 +172,28 @@ def update_ui_language(lang):
     )
 
 
+def update_ui_language(lang):
+    """
+    Update all UI components with the selected language.
+
+    Args:
+        lang (str): Language code
+
+    Returns:
+        tuple: Updated component properties, followed by the new language
+            for the current_lang state
+    """
+    # Gradio pops keys off update dicts while applying them, so hand out
+    # copies and keep the cached ones intact
+    return (
+        *(
+            dict(update) if isinstance(update, dict) else update
+            for update in _language_updates(lang)
+        ),
+        lang,
+    )
+
+
 def create_ui(pipe, prompt_expander_instance):
     """
     Create and configure the Gradio UI.
@@ -172,7 +207,7 @@ def create_ui(pipe, prompt_expander_instance):
     """
     # Get initial translations
     initial_lang = "en"
-    t = TRANSLATIONS[initial_lang]
+    t = get_translations(initial_lang)
 
     with gr.Blocks(title="Z-Image Turbo") as demo:
         # Language selector at the top
@@ -190,17 +225,7 @@ def create_ui(pipe, prompt_expander_instance):
         # Store current language in state
         current_lang = gr.State(value="en")
 
-        header_md = gr.Markdown(
-            f"""<div align="center">
-
-# {t['title']}
-
-[![GitHub](https://img.shields.io/badge/GitHub-little--scripts-181717?logo=github&logoColor=white)](https://github.com/athrael-soju/little-scripts)
-
-*{t['subtitle']}*
-
-</div>"""
-        )
+        header_md = gr.Markdown(_header_markdown(initial_lang))
 
         with gr.Row():
             with gr.Column(scale=1):
@@ -211,17 +236,16 @@ def create_ui(pipe, prompt_expander_instance):
                 )
 
                 with gr.Row():
-                    choices = [int(k) for k in RES_CHOICES.keys()]
                     res_cat = gr.Dropdown(
                         value=1024,
-                        choices=choices,
+                        choices=list(_RES_CAT_INT_CHOICES),
                         label=t["resolution_category"],
                     )
 
                     initial_res_choices = RES_CHOICES["1024"]
                     resolution = gr.Dropdown(
                         value=initial_res_choices[0],
-                        choices=RESOLUTION_SET,
+                        choices=list(RESOLUTION_SET),
                         label=t["resolution_label"],
                     )
 
@@ -251,7 +275,7 @@ def create_ui(pipe, prompt_expander_instance):
                 example_header = gr.Markdown(f"### {t['example_prompts']}")
                 example_dataset = gr.Dataset(
                     components=[prompt_input],
-                    samples=EXAMPLE_PROMPTS["en"],
+                    samples=_EXAMPLES_BY_LANG[initial_lang],
                     type="index",
                 )
 
@@ -267,7 +291,7 @@ def create_ui(pipe, prompt_expander_instance):
                 )
                 used_seed = gr.Textbox(label=t["seed_used"], interactive=False)
 
-        # Language change handler
+        # Language change handler, also storing the language in state
         lang_dropdown.change(
             update_ui_language,
             inputs=[lang_dropdown],
@@ -285,23 +309,16 @@ def create_ui(pipe, prompt_expander_instance):
                 example_dataset,
                 output_gallery,
                 used_seed,
+                current_lang,
             ],
         )
 
-        # Update current language state
-        lang_dropdown.change(
-            lambda x: x,
-            inputs=[lang_dropdown],
-            outputs=[current_lang],
-        )
-
         res_cat.change(update_res_choices, inputs=res_cat, outputs=resolution)
 
         # Example dataset click handler
         def select_example(evt: gr.SelectData, lang):
             """Handle example selection based on current language."""
-            examples = EXAMPLE_PROMPTS.get(lang, EXAMPLE_PROMPTS["en"])
-            return examples[evt.index][0]
+            return _EXAMPLES_BY_LANG[lang][evt.index][0]
 
         example_dataset.select(
             select_example,
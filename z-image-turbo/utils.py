@@ -1,6 +1,15 @@
 """Utility functions for Z-Image-Turbo application."""
 
+import functools
+import re
 
+from config import RES_WH
+
+# "WIDTHxHEIGHT", tolerating spaces and the "×" sign
+_RES_RE = re.compile(r"(\d+)\s*[×x]\s*(\d+)")
+
+
+@functools.lru_cache(maxsize=64)
 def get_resolution(resolution):
     """
     Extract width and height from resolution string.
@@ -11,19 +20,12 @@ def get_resolution(resolution):
     Returns:
         tuple: (width, height) as integers
     """
-    # Remove all whitespace and normalize separator
-    normalized = resolution.replace(" ", "").replace("×", "x")
-
-    # Split by 'x' and parse dimensions
-    if "x" in normalized:
-        parts = normalized.split("x", 1)
-        if len(parts) == 2:
-            try:
-                # Extract only digits from each part
-                width = int("".join(c for c in parts[0] if c.isdigit()))
-                height = int("".join(c for c in parts[1] if c.isdigit()))
-                return width, height
-            except ValueError:
-                pass
+    # Known resolutions are parsed once at import
+    if resolution in RES_WH:
+        return RES_WH[resolution]
+
+    match = _RES_RE.search(resolution)
+    if match:
+        return int(match[1]), int(match[2])
 
     return 1024, 1024